@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from pymongo import ReturnDocument
+
+
+def build_results(poll: dict) -> dict:
+    """Compute the results payload for a poll document"""
+    total_votes = sum(option["votes"] for option in poll["options"])
+
+    results = {
+        "poll_id": poll["id"],
+        "title": poll["title"],
+        "description": poll["description"],
+        "total_votes": total_votes,
+        "options": []
+    }
+
+    for option in poll["options"]:
+        percentage = (option["votes"] / total_votes * 100) if total_votes > 0 else 0
+        results["options"].append({
+            "id": option["id"],
+            "title": option["title"],
+            "description": option["description"],
+            "votes": option["votes"],
+            "percentage": round(percentage, 2)
+        })
+
+    return results
+
+
+class PollLifecycle:
+    """Opens and closes scheduled polls and keeps their frozen results.
+
+    Deadlines live in a min-heap keyed by ``closes_at`` so the scheduler only
+    ever looks at the next poll due. The heap is rebuilt periodically from the
+    ``(active, closes_at)`` index to pick up polls created on other replicas.
+    Closed polls keep their final results as pre-rendered JSON bytes.
+    """
+
+    def __init__(self, polls_collection, refresh_interval: float = 60.0):
+        self.polls_collection = polls_collection
+        self.refresh_interval = refresh_interval
+        self._schedules: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        self._deadlines: List[Tuple[datetime, str]] = []
+        self._closed: Set[str] = set()
+        self._snapshots: Dict[str, bytes] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def track(self, poll: dict) -> None:
+        """Register a poll's schedule, queueing its deadline if it has one"""
+        opens_at = poll.get("opens_at")
+        closes_at = poll.get("closes_at")
+        if opens_at is None and closes_at is None:
+            return
+
+        schedule = (opens_at, closes_at)
+        if self._schedules.get(poll["id"]) == schedule:
+            return
+        self._schedules[poll["id"]] = schedule
+
+        if closes_at is not None and poll.get("active", True):
+            heapq.heappush(self._deadlines, (closes_at, poll["id"]))
+            # Wake the scheduler in case this deadline is earlier than the one it sleeps on
+            self._wakeup.set()
+
+    def rejection(self, poll_id: str, now: Optional[datetime] = None) -> Optional[str]:
+        """Return why a poll cannot take votes, using in-memory state only"""
+        if poll_id in self._closed:
+            return "Poll is closed"
+
+        schedule = self._schedules.get(poll_id)
+        if schedule is None:
+            return None
+
+        now = now or datetime.utcnow()
+        opens_at, closes_at = schedule
+        if opens_at is not None and now < opens_at:
+            return "Poll is not open yet"
+        if closes_at is not None and now >= closes_at:
+            return "Poll is closed"
+        return None
+
+    def snapshot(self, poll_id: str) -> Optional[bytes]:
+        """Return the frozen results of a closed poll, if cached"""
+        return self._snapshots.get(poll_id)
+
+    def remember(self, poll_id: str, final_results: dict) -> bytes:
+        """Cache final results that were frozen earlier or by another replica"""
+        self._closed.add(poll_id)
+        self._schedules.pop(poll_id, None)
+        return self._snapshots.setdefault(poll_id, json.dumps(final_results).encode())
+
+    async def close(self, poll_id: str) -> bool:
+        """Close a poll and freeze its results. Returns False if the poll does not exist"""
+        poll = await self.polls_collection.find_one_and_update(
+            {"id": poll_id, "active": True},
+            {"$set": {"active": False}},
+            projection={"_id": False},
+            return_document=ReturnDocument.AFTER
+        )
+
+        if poll is None:
+            # Already closed (possibly by another replica) or unknown
+            poll = await self.polls_collection.find_one({"id": poll_id}, {"_id": False})
+            if poll is None:
+                return False
+            if poll.get("final_results"):
+                self.remember(poll_id, poll["final_results"])
+                return True
+
+        final_results = build_results(poll)
+        await self.polls_collection.update_one(
+            {"id": poll_id},
+            {"$set": {"final_results": final_results}}
+        )
+        self.remember(poll_id, final_results)
+        return True
+
+    async def rebuild(self) -> None:
+        """Reload upcoming deadlines from the (active, closes_at) index"""
+        deadlines = []
+        cursor = self.polls_collection.find(
+            {"active": True, "closes_at": {"$ne": None}},
+            {"_id": False, "id": True, "opens_at": True, "closes_at": True}
+        )
+        async for poll in cursor:
+            self._schedules[poll["id"]] = (poll.get("opens_at"), poll["closes_at"])
+            deadlines.append((poll["closes_at"], poll["id"]))
+
+        # Keep deadlines queued by track() while the cursor was being read
+        loaded = set(deadlines)
+        for entry in self._deadlines:
+            closes_at, poll_id = entry
+            schedule = self._schedules.get(poll_id)
+            if (entry not in loaded and poll_id not in self._closed
+                    and schedule is not None and schedule[1] == closes_at):
+                deadlines.append(entry)
+
+        heapq.heapify(deadlines)
+        self._deadlines = deadlines
+
+    async def _close_due(self) -> None:
+        now = datetime.utcnow()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            closes_at, poll_id = heapq.heappop(self._deadlines)
+            schedule = self._schedules.get(poll_id)
+            # Skip entries superseded by a newer schedule or an earlier close
+            if poll_id in self._closed or schedule is None or schedule[1] != closes_at:
+                continue
+            try:
+                await self.close(poll_id)
+                print(f"Closed poll {poll_id} on schedule")
+            except Exception as e:
+                print(f"Failed to close poll {poll_id}: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_refresh = loop.time() + self.refresh_interval
+        while True:
+            if loop.time() >= next_refresh:
+                try:
+                    await self.rebuild()
+                except Exception as e:
+                    print(f"Failed to refresh poll schedule: {e}")
+                next_refresh = loop.time() + self.refresh_interval
+
+            await self._close_due()
+
+            timeout = next_refresh - loop.time()
+            if self._deadlines:
+                until_deadline = (self._deadlines[0][0] - datetime.utcnow()).total_seconds()
+                timeout = min(timeout, until_deadline)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """Load the schedule and start the background scheduler"""
+        await self.rebuild()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background scheduler"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,13 +1,13 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 from dotenv import load_dotenv
-from .routes import polls
 
-# Load environment variables
+# Load environment variables before modules that read them at import time
 load_dotenv()
 
+from . import tenants
+from .routes import polls
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Voting App API",
@@ -27,27 +27,17 @@ app.add_middleware(
 # Include routers
 app.include_router(polls.router)
 
-# Database configuration
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DATABASE_NAME = os.getenv("DATABASE_NAME", "voting_app")
-
 @app.on_event("startup")
 async def startup_event():
     """Initialize database connection on startup"""
     try:
-        client = AsyncIOMotorClient(MONGO_URL)
         # Test connection
-        await client.admin.command('ping')
-        print(f"Connected to MongoDB at {MONGO_URL}")
-        
-        # Create indexes for better performance
-        database = client[DATABASE_NAME]
-        polls_collection = database.polls
-        votes_collection = database.votes
+        await tenants.client.admin.command('ping')
+        print(f"Connected to MongoDB at {tenants.MONGO_URL}")
         
-        # Create index on poll_id and voter_ip for votes collection
-        await votes_collection.create_index([("poll_id", 1), ("voter_ip", 1)], unique=True)
-        await polls_collection.create_index([("id", 1)], unique=True)
+        # Create indexes and start scheduled-poll and trending tasks for known tenants;
+        # others are initialized on their first request
+        await tenants.registry.start()
         
         print("Database indexes created successfully")
         
@@ -55,6 +45,11 @@ async def startup_event():
         print(f"Failed to connect to MongoDB: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks on shutdown"""
+    await tenants.registry.stop()
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
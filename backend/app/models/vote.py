@@ -1,8 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Store schedule times as naive UTC, matching created_at and MongoDB"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 class VoteOption(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -15,8 +21,15 @@ class Poll(BaseModel):
     description: str
     options: List[VoteOption]
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    opens_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
     active: bool = True
 
+    @field_validator("opens_at", "closes_at")
+    @classmethod
+    def normalize_schedule(cls, value):
+        return _to_naive_utc(value)
+
 class Vote(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     poll_id: str
@@ -31,4 +44,11 @@ class VoteRequest(BaseModel):
 class PollCreate(BaseModel):
     title: str
     description: str
-    options: List[dict]  # [{title: str, description: str}]
\ No newline at end of file
+    options: List[dict]  # [{title: str, description: str}]
+    opens_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
+
+    @field_validator("opens_at", "closes_at")
+    @classmethod
+    def normalize_schedule(cls, value):
+        return _to_naive_utc(value)
\ No newline at end of file
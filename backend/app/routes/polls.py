@@ -1,26 +1,25 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends, Response, Query
 from typing import List
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
 from ..models.vote import Poll, VoteRequest, PollCreate, Vote, VoteOption
+from ..lifecycle import build_results
+from ..tenants import Tenant, get_tenant
+from ..trending import WINDOWS
 from datetime import datetime
 import uuid
 
 router = APIRouter()
 
-# Database connection
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DATABASE_NAME = os.getenv("DATABASE_NAME", "voting_app")
-
-client = AsyncIOMotorClient(MONGO_URL)
-database = client[DATABASE_NAME]
-polls_collection = database.polls
-votes_collection = database.votes
-
 @router.post("/api/polls", response_model=Poll)
-async def create_poll(poll_data: PollCreate):
+async def create_poll(poll_data: PollCreate, tenant: Tenant = Depends(get_tenant)):
     """Create a new poll"""
     try:
+        if poll_data.opens_at and poll_data.closes_at and poll_data.closes_at <= poll_data.opens_at:
+            raise HTTPException(status_code=400, detail="closes_at must be after opens_at")
+        if poll_data.closes_at and poll_data.closes_at <= datetime.utcnow():
+            raise HTTPException(status_code=400, detail="closes_at must be in the future")
+
+        await tenant.check_poll_quota()
+
         # Create vote options with IDs
         options = []
         for option_data in poll_data.options:
@@ -35,27 +34,32 @@ async def create_poll(poll_data: PollCreate):
         poll = Poll(
             title=poll_data.title,
             description=poll_data.description,
-            options=options
+            options=options,
+            opens_at=poll_data.opens_at,
+            closes_at=poll_data.closes_at
         )
         
         # Insert into database
         poll_dict = poll.dict()
-        result = await polls_collection.insert_one(poll_dict)
+        result = await tenant.polls.insert_one(poll_dict)
         
         if result.inserted_id:
+            tenant.lifecycle.track(poll_dict)
             return poll
         else:
             raise HTTPException(status_code=500, detail="Failed to create poll")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating poll: {str(e)}")
 
 @router.get("/api/polls", response_model=List[Poll])
-async def get_all_polls():
+async def get_all_polls(tenant: Tenant = Depends(get_tenant)):
     """Get all active polls"""
     try:
         polls = []
-        async for poll in polls_collection.find({"active": True}):
+        async for poll in tenant.polls.find({"active": True}):
             # Remove MongoDB _id field
             poll.pop("_id", None)
             polls.append(Poll(**poll))
@@ -63,11 +67,46 @@ async def get_all_polls():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching polls: {str(e)}")
 
+@router.get("/api/polls/trending")
+async def get_trending_polls(
+    window: str = "5m",
+    limit: int = Query(20, ge=1, le=100),
+    tenant: Tenant = Depends(get_tenant)
+):
+    """Get the polls with the most votes in a recent time window"""
+    if window not in WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid window, expected one of: {', '.join(WINDOWS)}"
+        )
+    
+    try:
+        top = tenant.trending.top(window, limit)
+        
+        # Look up titles for the top polls only
+        titles = {}
+        async for poll in tenant.polls.find(
+            {"id": {"$in": [poll_id for poll_id, _ in top]}},
+            {"_id": False, "id": True, "title": True}
+        ):
+            titles[poll["id"]] = poll["title"]
+        
+        return {
+            "window": window,
+            "polls": [
+                {"poll_id": poll_id, "title": titles[poll_id], "votes": votes}
+                for poll_id, votes in top
+                if poll_id in titles
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching trending polls: {str(e)}")
+
 @router.get("/api/polls/{poll_id}", response_model=Poll)
-async def get_poll(poll_id: str):
+async def get_poll(poll_id: str, tenant: Tenant = Depends(get_tenant)):
     """Get a specific poll by ID"""
     try:
-        poll = await polls_collection.find_one({"id": poll_id, "active": True})
+        poll = await tenant.polls.find_one({"id": poll_id, "active": True})
         if poll:
             poll.pop("_id", None)
             return Poll(**poll)
@@ -77,45 +116,71 @@ async def get_poll(poll_id: str):
         raise HTTPException(status_code=500, detail=f"Error fetching poll: {str(e)}")
 
 @router.post("/api/votes")
-async def cast_vote(vote_request: VoteRequest, request: Request):
+async def cast_vote(vote_request: VoteRequest, request: Request, tenant: Tenant = Depends(get_tenant)):
     """Cast a vote for a poll option"""
     try:
         # Get voter IP
         voter_ip = request.client.host
         
-        # Check if poll exists and is active
-        poll = await polls_collection.find_one({"id": vote_request.poll_id, "active": True})
-        if not poll:
-            raise HTTPException(status_code=404, detail="Poll not found or inactive")
-        
-        # Check if voter has already voted for this poll
-        existing_vote = await votes_collection.find_one({
-            "poll_id": vote_request.poll_id,
-            "voter_ip": voter_ip
-        })
-        if existing_vote:
-            raise HTTPException(status_code=400, detail="You have already voted for this poll")
+        # Reject closed or not-yet-open polls without touching the database
+        rejection = tenant.lifecycle.rejection(vote_request.poll_id)
+        if rejection:
+            raise HTTPException(status_code=400, detail=rejection)
         
-        # Verify option exists
-        option_exists = any(option["id"] == vote_request.option_id for option in poll["options"])
-        if not option_exists:
-            raise HTTPException(status_code=400, detail="Invalid option selected")
-        
-        # Create vote record
-        vote = Vote(
-            poll_id=vote_request.poll_id,
-            option_id=vote_request.option_id,
-            voter_ip=voter_ip
-        )
+        # Throttle before any database access; votes rejected below refund their token
+        tenant.check_vote_quota()
         
-        # Insert vote
-        await votes_collection.insert_one(vote.dict())
-        
-        # Update vote count for the option
-        await polls_collection.update_one(
-            {"id": vote_request.poll_id, "options.id": vote_request.option_id},
-            {"$inc": {"options.$.votes": 1}}
-        )
+        try:
+            # Check if poll exists and is active
+            poll = await tenant.polls.find_one({"id": vote_request.poll_id, "active": True})
+            if not poll:
+                raise HTTPException(status_code=404, detail="Poll not found or inactive")
+            
+            # Polls created on another replica are learned here on first vote
+            tenant.lifecycle.track(poll)
+            rejection = tenant.lifecycle.rejection(vote_request.poll_id)
+            if rejection:
+                raise HTTPException(status_code=400, detail=rejection)
+            
+            # Check if voter has already voted for this poll
+            existing_vote = await tenant.votes.find_one({
+                "poll_id": vote_request.poll_id,
+                "voter_ip": voter_ip
+            })
+            if existing_vote:
+                raise HTTPException(status_code=400, detail="You have already voted for this poll")
+            
+            # Verify option exists
+            option_exists = any(option["id"] == vote_request.option_id for option in poll["options"])
+            if not option_exists:
+                raise HTTPException(status_code=400, detail="Invalid option selected")
+            
+            # Create vote record
+            vote = Vote(
+                poll_id=vote_request.poll_id,
+                option_id=vote_request.option_id,
+                voter_ip=voter_ip
+            )
+            
+            # Insert vote
+            await tenant.votes.insert_one(vote.dict())
+            
+            # Update vote count for the option, unless the poll closed meanwhile
+            result = await tenant.polls.update_one(
+                {"id": vote_request.poll_id, "active": True, "options.id": vote_request.option_id},
+                {"$inc": {"options.$.votes": 1}}
+            )
+            if not result.matched_count:
+                # The poll closed after the checks above; undo the vote so it is neither
+                # lost from the counts nor blocking the voter
+                await tenant.votes.delete_one({"id": vote.id})
+                raise HTTPException(status_code=400, detail="Poll is closed")
+        except HTTPException:
+            tenant.refund_vote_quota()
+            raise
+        
+        if result.modified_count == 1:
+            tenant.trending.record(vote_request.poll_id)
         
         return {"message": "Vote cast successfully", "vote_id": vote.id}
         
@@ -125,53 +190,39 @@ async def cast_vote(vote_request: VoteRequest, request: Request):
         raise HTTPException(status_code=500, detail=f"Error casting vote: {str(e)}")
 
 @router.get("/api/polls/{poll_id}/results")
-async def get_poll_results(poll_id: str):
+async def get_poll_results(poll_id: str, tenant: Tenant = Depends(get_tenant)):
     """Get results for a specific poll"""
     try:
-        poll = await polls_collection.find_one({"id": poll_id})
+        # Closed polls are served from their frozen snapshot
+        snapshot = tenant.lifecycle.snapshot(poll_id)
+        if snapshot is not None:
+            return Response(content=snapshot, media_type="application/json")
+        
+        poll = await tenant.polls.find_one({"id": poll_id})
         if not poll:
             raise HTTPException(status_code=404, detail="Poll not found")
         
-        # Calculate total votes
-        total_votes = sum(option["votes"] for option in poll["options"])
-        
-        # Prepare results
-        results = {
-            "poll_id": poll_id,
-            "title": poll["title"],
-            "description": poll["description"],
-            "total_votes": total_votes,
-            "options": []
-        }
-        
-        for option in poll["options"]:
-            percentage = (option["votes"] / total_votes * 100) if total_votes > 0 else 0
-            results["options"].append({
-                "id": option["id"],
-                "title": option["title"],
-                "description": option["description"],
-                "votes": option["votes"],
-                "percentage": round(percentage, 2)
-            })
+        if poll.get("final_results"):
+            snapshot = tenant.lifecycle.remember(poll_id, poll["final_results"])
+            return Response(content=snapshot, media_type="application/json")
         
-        return results
+        return build_results(poll)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting results: {str(e)}")
 
 @router.delete("/api/polls/{poll_id}")
-async def delete_poll(poll_id: str):
-    """Deactivate a poll (soft delete)"""
+async def delete_poll(poll_id: str, tenant: Tenant = Depends(get_tenant)):
+    """Deactivate a poll (soft delete), freezing its results"""
     try:
-        result = await polls_collection.update_one(
-            {"id": poll_id},
-            {"$set": {"active": False}}
-        )
-        
-        if result.matched_count:
+        if await tenant.lifecycle.close(poll_id):
             return {"message": "Poll deactivated successfully"}
         else:
             raise HTTPException(status_code=404, detail="Poll not found")
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deactivating poll: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,295 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from .lifecycle import PollLifecycle
+from .trending import TrendingCounter
+
+# Database connection
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "voting_app")
+
+# Tenant routing configuration
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant-ID")
+TENANT_DOMAIN = os.getenv("TENANT_DOMAIN", "")  # e.g. voting.example.com -> acme.voting.example.com
+# With host routing on, the header is only honoured from these client addresses
+TENANT_TRUSTED_PROXIES = {ip for ip in os.getenv("TENANT_TRUSTED_PROXIES", "").split(",") if ip}
+TENANT_MODE = os.getenv("TENANT_MODE", "database")  # "database" or "collection"
+TENANT_ALLOWLIST = {name for name in os.getenv("TENANT_ALLOWLIST", "").split(",") if name}
+DEFAULT_TENANT = "default"
+
+if TENANT_MODE not in ("database", "collection"):
+    raise ValueError(f"TENANT_MODE must be 'database' or 'collection', got {TENANT_MODE!r}")
+
+# Default per-tenant quotas, 0 means unlimited. Overridable per tenant in the tenants
+# collection; values are read when a replica first initializes the tenant, so
+# changing them takes effect after a restart. The vote rate is enforced per replica
+TENANT_MAX_POLLS = int(os.getenv("TENANT_MAX_POLLS", "0"))
+TENANT_VOTES_PER_SECOND = float(os.getenv("TENANT_VOTES_PER_SECOND", "0"))
+
+_TENANT_NAME = re.compile(r"^[a-z0-9][a-z0-9-]{0,31}$")
+
+# Unknown tenant names are remembered briefly so repeated lookups skip the database
+_UNKNOWN_TENANT_TTL = 30.0
+_UNKNOWN_TENANT_CACHE_SIZE = 1024
+
+client = AsyncIOMotorClient(MONGO_URL)
+# Registry of known tenants and their quota overrides, kept in the main database
+tenants_collection = client[DATABASE_NAME].tenants
+
+
+@lru_cache(maxsize=1024)
+def _tenant_from_host(host: str, domain: str) -> Optional[str]:
+    hostname = host.split(":", 1)[0].lower()
+    if hostname.endswith("." + domain):
+        return hostname[:-len(domain) - 1]
+    return None
+
+
+def resolve_tenant_name(header: Optional[str], host: Optional[str],
+                        client_ip: Optional[str] = None) -> str:
+    """Resolve the tenant name for a request.
+
+    With ``TENANT_DOMAIN`` set the host subdomain decides, and the header is
+    only trusted from ``TENANT_TRUSTED_PROXIES``. Otherwise the header is used.
+    """
+    name = None
+    if header and (not TENANT_DOMAIN or client_ip in TENANT_TRUSTED_PROXIES):
+        name = header.strip().lower()
+    elif TENANT_DOMAIN and host:
+        name = _tenant_from_host(host, TENANT_DOMAIN)
+    name = name or DEFAULT_TENANT
+
+    if not _TENANT_NAME.match(name):
+        raise HTTPException(status_code=400, detail="Invalid tenant")
+    return name
+
+
+class _RateLimiter:
+    """Token bucket allowing ``rate`` events per second.
+
+    The bucket holds one second of events, and at least one event so that
+    rates below one per second still let votes through.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class Tenant:
+    """Collection handles, background tasks and quotas for one tenant.
+
+    Each tenant gets its own database (or its own collection prefix in
+    ``collection`` mode), so its indexes and working set are sized by its
+    own data only. The default tenant maps to the original unprefixed
+    collections in ``DATABASE_NAME``.
+    """
+
+    def __init__(self, name: str, max_polls: int = TENANT_MAX_POLLS,
+                 votes_per_second: float = TENANT_VOTES_PER_SECOND):
+        self.name = name
+        if name == DEFAULT_TENANT:
+            database, prefix = client[DATABASE_NAME], ""
+        elif TENANT_MODE == "collection":
+            database, prefix = client[DATABASE_NAME], f"{name}_"
+        else:
+            database, prefix = client[f"{DATABASE_NAME}_{name}"], ""
+
+        self.polls = database[f"{prefix}polls"]
+        self.votes = database[f"{prefix}votes"]
+        self.trending_collection = database[f"{prefix}trending"]
+        self.lifecycle = PollLifecycle(self.polls)
+        self.trending = TrendingCounter(self.trending_collection)
+
+        self.max_polls = max_polls
+        self._vote_limiter = _RateLimiter(votes_per_second) if votes_per_second > 0 else None
+
+    async def create_indexes(self) -> None:
+        """Create this tenant's collections and indexes"""
+        # Create index on poll_id and voter_ip for votes collection
+        await self.votes.create_index([("poll_id", 1), ("voter_ip", 1)], unique=True)
+        await self.polls.create_index([("id", 1)], unique=True)
+        # Index backing the poll lifecycle scheduler's deadline lookups
+        await self.polls.create_index([("active", 1), ("closes_at", 1)])
+        # One document per replica holding its trending counts; stale replicas expire
+        await self.trending_collection.create_index([("replica_id", 1)], unique=True)
+        await self.trending_collection.create_index([("updated_at", 1)], expireAfterSeconds=300)
+
+    async def bootstrap(self) -> None:
+        """Create this tenant's indexes and start its background tasks"""
+        await self.create_indexes()
+        await self.lifecycle.start()
+        await self.trending.start()
+
+    async def stop(self) -> None:
+        """Stop this tenant's background tasks"""
+        await self.lifecycle.stop()
+        await self.trending.stop()
+
+    async def check_poll_quota(self) -> None:
+        """Raise 429 if the tenant already has its maximum number of polls"""
+        if self.max_polls and await self.polls.count_documents({"active": True}) >= self.max_polls:
+            raise HTTPException(status_code=429, detail="Poll quota exceeded for tenant")
+
+    def check_vote_quota(self) -> None:
+        """Raise 429 if the tenant is voting faster than its rate limit.
+
+        The limit is held in memory, so each replica allows the full rate.
+        """
+        if self._vote_limiter is not None and not self._vote_limiter.allow():
+            raise HTTPException(status_code=429, detail="Vote rate limit exceeded for tenant")
+
+    def refund_vote_quota(self) -> None:
+        """Return the token taken by check_vote_quota for a vote that was rejected"""
+        if self._vote_limiter is not None:
+            self._vote_limiter.refund()
+
+
+class TenantRegistry:
+    """Lazily creates and caches one Tenant per registered tenant name.
+
+    Only the default tenant, tenants recorded in the tenants collection (see
+    ``register_tenant``) and names in ``TENANT_ALLOWLIST`` are routed; any
+    other name is a 404 and leaves no state behind. Unknown names are cached
+    for ``_UNKNOWN_TENANT_TTL`` seconds, so a newly registered tenant can take
+    that long to be routed on replicas that recently rejected it.
+    """
+
+    def __init__(self):
+        self._tenants: Dict[str, Tenant] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._unknown: "OrderedDict[str, float]" = OrderedDict()
+
+    async def get(self, name: str) -> Tenant:
+        tenant = self._tenants.get(name)
+        if tenant is not None:
+            return tenant
+
+        now = time.monotonic()
+        expires = self._unknown.get(name)
+        if expires is not None:
+            if expires > now:
+                raise HTTPException(status_code=404, detail="Unknown tenant")
+            del self._unknown[name]
+
+        record = await tenants_collection.find_one({"name": name}, {"_id": False})
+        if record is None and name != DEFAULT_TENANT and name not in TENANT_ALLOWLIST:
+            self._unknown[name] = now + _UNKNOWN_TENANT_TTL
+            if len(self._unknown) > _UNKNOWN_TENANT_CACHE_SIZE:
+                self._unknown.popitem(last=False)
+            raise HTTPException(status_code=404, detail="Unknown tenant")
+
+        # Per-tenant lock so one tenant's bootstrap never blocks another's requests
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            tenant = self._tenants.get(name)
+            if tenant is None:
+                try:
+                    tenant = await self._initialize(name, record)
+                except Exception as e:
+                    print(f"Failed to initialize tenant {name}: {e}")
+                    raise HTTPException(status_code=503, detail="Tenant unavailable")
+                self._tenants[name] = tenant
+            return tenant
+
+    async def _initialize(self, name: str, record: Optional[dict]) -> Tenant:
+        record = record or {}
+        tenant = Tenant(
+            name,
+            max_polls=record.get("max_polls", TENANT_MAX_POLLS),
+            votes_per_second=record.get("votes_per_second", TENANT_VOTES_PER_SECOND)
+        )
+        await tenant.bootstrap()
+        # Record the tenant only once it is usable, so startup can rely on it
+        await tenants_collection.update_one(
+            {"name": name},
+            {"$setOnInsert": {"name": name}},
+            upsert=True
+        )
+        print(f"Initialized tenant {name}")
+        return tenant
+
+    async def start(self) -> None:
+        """Initialize every known tenant so their scheduled polls close on time"""
+        await tenants_collection.create_index([("name", 1)], unique=True)
+        await self.get(DEFAULT_TENANT)
+        names = [record["name"] async for record in tenants_collection.find({}, {"_id": False, "name": True})]
+        for name in names:
+            try:
+                await self.get(name)
+            except HTTPException:
+                # Already logged; keep serving the other tenants
+                pass
+
+    async def stop(self) -> None:
+        """Stop background tasks for all initialized tenants"""
+        for tenant in self._tenants.values():
+            await tenant.stop()
+
+
+registry = TenantRegistry()
+
+
+async def get_tenant(request: Request) -> Tenant:
+    """FastAPI dependency resolving the tenant for the current request"""
+    name = resolve_tenant_name(
+        request.headers.get(TENANT_HEADER),
+        request.headers.get("host"),
+        request.client.host if request.client else None
+    )
+    return await registry.get(name)
+
+
+async def register_tenant(name: str, max_polls: Optional[int] = None,
+                          votes_per_second: Optional[float] = None) -> None:
+    """Create a tenant's indexes and record it so requests are routed to it"""
+    if not _TENANT_NAME.match(name):
+        raise ValueError(f"Invalid tenant name: {name}")
+
+    await Tenant(name).create_indexes()
+    quotas = {}
+    if max_polls is not None:
+        quotas["max_polls"] = max_polls
+    if votes_per_second is not None:
+        quotas["votes_per_second"] = votes_per_second
+    await tenants_collection.update_one(
+        {"name": name},
+        {"$set": {"name": name, **quotas}},
+        upsert=True
+    )
+
+
+if __name__ == "__main__":
+    # Admin entry point, run with the app's environment:
+    # python -m app.tenants <name> [--max-polls N] [--votes-per-second R]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Register a tenant")
+    parser.add_argument("name")
+    parser.add_argument("--max-polls", type=int)
+    parser.add_argument("--votes-per-second", type=float)
+    args = parser.parse_args()
+
+    asyncio.run(register_tenant(args.name, args.max_polls, args.votes_per_second))
+    print(f"Registered tenant {args.name}")
@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Supported trending windows, in seconds, keyed by their query-string label
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+_WINDOW_SIZES = tuple(WINDOWS.values())
+
+# Upper bound on polls counted by each TrendingCounter, i.e. per tenant on each
+# replica. When full, the coldest tenth is dropped, which is the decay that
+# keeps the long tail from growing memory
+MAX_TRACKED_POLLS = int(os.getenv("TRENDING_MAX_POLLS", "10000"))
+
+# While a counter has nothing local or remote, only every Nth sync checks the
+# other replicas, so idle tenants cost almost nothing
+IDLE_SYNC_EVERY = 12
+
+
+class _PollWindow:
+    """Per-second vote buckets for one poll with running totals per window.
+
+    Only seconds that received votes are stored, so a poll with a single
+    vote holds a single bucket. Each window keeps a queue of the buckets it
+    still covers; the bucket objects are shared, so a vote is counted once
+    and expiring a bucket is O(1) amortized per bucket and window.
+    """
+
+    __slots__ = ("buckets", "totals", "last")
+
+    def __init__(self, now: int):
+        self.buckets = tuple(deque() for _ in _WINDOW_SIZES)
+        self.totals = [0] * len(_WINDOW_SIZES)
+        self.last = now
+
+    def advance(self, now: int) -> None:
+        if now <= self.last:
+            return
+        self.last = now
+        for i, size in enumerate(_WINDOW_SIZES):
+            buckets = self.buckets[i]
+            while buckets and buckets[0][0] <= now - size:
+                self.totals[i] -= buckets.popleft()[1]
+
+    def record(self, now: int) -> None:
+        # Never write behind buckets that have already expired if the clock steps back
+        now = max(now, self.last)
+        self.advance(now)
+        newest = self.buckets[0][-1] if self.buckets[0] else None
+        if newest is not None and newest[0] == now:
+            newest[1] += 1
+        else:
+            bucket = [now, 1]
+            for buckets in self.buckets:
+                buckets.append(bucket)
+        for i in range(len(self.totals)):
+            self.totals[i] += 1
+
+
+class TrendingCounter:
+    """Sliding-window vote counts per poll, merged across replicas.
+
+    Each replica counts its own votes in per-second buckets and periodically
+    publishes its window totals to the ``trending`` collection, reading back
+    the totals published by the other replicas. Polls with no votes in the
+    largest window are dropped and at most ``MAX_TRACKED_POLLS`` are kept,
+    so memory stays bounded however many polls receive votes.
+
+    Queries rank the running totals with ``heapq.nlargest``, O(N log K) over
+    the tracked polls rather than O(K log N): keeping a sorted index would
+    put an O(log N) update on every vote and every bucket expiry, and N is
+    capped. A count-min sketch for the long tail is likewise not used, since
+    polls evicted by the cap are by definition too cold to be trending.
+    """
+
+    def __init__(self, trending_collection, sync_interval: float = 5.0,
+                 replica_id: Optional[str] = None):
+        self.trending_collection = trending_collection
+        self.sync_interval = sync_interval
+        self.replica_id = replica_id or os.getenv("HOSTNAME") or str(uuid.uuid4())
+        self._windows: Dict[str, _PollWindow] = {}
+        self._remote: Dict[str, List[int]] = {}
+        self._published_empty = True
+        self._idle_syncs = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, poll_id: str) -> None:
+        """Count one vote for a poll"""
+        now = int(time.time())
+        window = self._windows.get(poll_id)
+        if window is None:
+            if len(self._windows) >= MAX_TRACKED_POLLS:
+                self._evict(now)
+            window = self._windows[poll_id] = _PollWindow(now)
+        window.record(now)
+
+    def _evict(self, now: int) -> None:
+        """Drop the coldest tenth of tracked polls by largest-window votes"""
+        for poll_window in self._windows.values():
+            poll_window.advance(now)
+        coldest = heapq.nsmallest(
+            max(1, MAX_TRACKED_POLLS // 10),
+            self._windows,
+            key=lambda poll_id: self._windows[poll_id].totals[-1]
+        )
+        for poll_id in coldest:
+            del self._windows[poll_id]
+
+    def top(self, window: str, limit: int) -> List[Tuple[str, int]]:
+        """Return up to ``limit`` (poll_id, votes) pairs, busiest first"""
+        index = list(WINDOWS).index(window)
+        now = int(time.time())
+
+        totals = {poll_id: counts[index] for poll_id, counts in self._remote.items()}
+        for poll_id, poll_window in self._windows.items():
+            poll_window.advance(now)
+            totals[poll_id] = totals.get(poll_id, 0) + poll_window.totals[index]
+
+        return heapq.nlargest(
+            limit,
+            ((poll_id, votes) for poll_id, votes in totals.items() if votes > 0),
+            key=lambda item: item[1]
+        )
+
+    def _local_totals(self) -> Dict[str, List[int]]:
+        now = int(time.time())
+        totals = {}
+        for poll_id, poll_window in list(self._windows.items()):
+            poll_window.advance(now)
+            if poll_window.totals[-1] == 0:
+                # Idle for the largest window, nothing left to report
+                del self._windows[poll_id]
+            else:
+                totals[poll_id] = list(poll_window.totals)
+        return totals
+
+    async def sync(self) -> None:
+        """Publish local totals and merge in the other replicas' totals"""
+        now = datetime.utcnow()
+        local = self._local_totals()
+
+        # Publish only when there is something to report or a previous report to clear
+        publish = bool(local) or not self._published_empty
+        if not publish and not self._remote:
+            self._idle_syncs += 1
+            if self._idle_syncs < IDLE_SYNC_EVERY:
+                return
+        self._idle_syncs = 0
+
+        if publish:
+            await self.trending_collection.update_one(
+                {"replica_id": self.replica_id},
+                {"$set": {"totals": local, "updated_at": now}},
+                upsert=True
+            )
+            self._published_empty = not local
+
+        remote: Dict[str, List[int]] = {}
+        cursor = self.trending_collection.find({
+            "replica_id": {"$ne": self.replica_id},
+            "updated_at": {"$gte": now - timedelta(seconds=self.sync_interval * 3)}
+        })
+        async for replica in cursor:
+            for poll_id, counts in replica["totals"].items():
+                merged = remote.setdefault(poll_id, [0] * len(_WINDOW_SIZES))
+                for i, count in enumerate(counts):
+                    merged[i] += count
+        if len(remote) > MAX_TRACKED_POLLS:
+            # Apply the same bound to the merged view of the other replicas
+            remote = dict(heapq.nlargest(
+                MAX_TRACKED_POLLS, remote.items(), key=lambda item: item[1][-1]
+            ))
+        self._remote = remote
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Failed to sync trending counts: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def start(self) -> None:
+        """Start the background replica sync"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background replica sync"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+
+class FakeCursor:
+    """Async iterator over documents, standing in for a motor cursor"""
+
+    def __init__(self, docs, on_next=None):
+        self.docs = list(docs)
+        self.on_next = on_next
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.on_next:
+            self.on_next()
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+
+def _matches(doc, query):
+    return all(doc.get(key) == value for key, value in query.items() if not isinstance(value, dict))
+
+
+class FakeCollection:
+    """In-memory stand-in for the motor collection calls the app makes.
+
+    ``find`` returns every document (the tests control what is stored);
+    ``find_one`` and ``delete_one`` match on plain equality fields only.
+    ``update_one`` records its arguments and reports ``matched`` documents.
+    """
+
+    def __init__(self, docs=(), on_next=None, matched=1):
+        self.docs = list(docs)
+        self.on_next = on_next
+        self.matched = matched
+        self.updates = []
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.docs, self.on_next)
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def delete_one(self, query):
+        doc = await self.find_one(query)
+        if doc is not None:
+            self.docs.remove(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=self.matched, modified_count=self.matched)
+
+    async def count_documents(self, query):
+        return sum(1 for doc in self.docs if _matches(doc, query))
+
+    async def create_index(self, *args, **kwargs):
+        pass
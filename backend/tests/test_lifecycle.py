@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.lifecycle import PollLifecycle
+
+from .conftest import FakeCollection
+
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_rejection_uses_schedule():
+    lifecycle = PollLifecycle(FakeCollection())
+    lifecycle.track({"id": "p", "opens_at": NOW, "closes_at": NOW + timedelta(hours=1)})
+
+    assert lifecycle.rejection("p", NOW - timedelta(seconds=1)) == "Poll is not open yet"
+    assert lifecycle.rejection("p", NOW) is None
+    assert lifecycle.rejection("p", NOW + timedelta(hours=1)) == "Poll is closed"
+
+
+def test_rejection_unknown_and_closed_polls():
+    lifecycle = PollLifecycle(FakeCollection())
+    assert lifecycle.rejection("unknown", NOW) is None
+
+    lifecycle.remember("done", {"poll_id": "done"})
+    assert lifecycle.rejection("done", NOW) == "Poll is closed"
+    assert lifecycle.snapshot("done") == b'{"poll_id": "done"}'
+
+
+def test_track_ignores_unscheduled_polls():
+    lifecycle = PollLifecycle(FakeCollection())
+    lifecycle.track({"id": "p", "opens_at": None, "closes_at": None})
+    assert lifecycle._deadlines == []
+    assert lifecycle.rejection("p", NOW) is None
+
+
+def test_close_due_skips_superseded_entries():
+    lifecycle = PollLifecycle(FakeCollection())
+    closed = []
+
+    async def close(poll_id):
+        closed.append(poll_id)
+        lifecycle.remember(poll_id, {})
+        return True
+
+    lifecycle.close = close
+    past = datetime.utcnow() - timedelta(minutes=5)
+
+    # Rescheduled poll: the old deadline entry stays in the heap but is stale
+    lifecycle.track({"id": "moved", "closes_at": past})
+    lifecycle.track({"id": "moved", "closes_at": past + timedelta(days=1)})
+    # Poll closed manually before its deadline
+    lifecycle.track({"id": "deleted", "closes_at": past})
+    lifecycle.remember("deleted", {})
+    # Poll due now
+    lifecycle.track({"id": "due", "closes_at": past})
+
+    asyncio.run(lifecycle._close_due())
+
+    assert closed == ["due"]
+    assert lifecycle._deadlines == [(past + timedelta(days=1), "moved")]
+
+
+def test_rebuild_keeps_deadlines_tracked_during_load():
+    closes_at = NOW + timedelta(minutes=1)
+    lifecycle = PollLifecycle(None)
+
+    def track_new_poll():
+        lifecycle.track({"id": "new", "closes_at": closes_at})
+
+    lifecycle.polls_collection = FakeCollection(
+        [{"id": "old", "closes_at": NOW + timedelta(minutes=2)}],
+        on_next=track_new_poll
+    )
+    asyncio.run(lifecycle.rebuild())
+
+    assert sorted(lifecycle._deadlines) == [
+        (closes_at, "new"),
+        (NOW + timedelta(minutes=2), "old"),
+    ]
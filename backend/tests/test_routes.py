@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.lifecycle import PollLifecycle
+from app.models.vote import PollCreate, VoteRequest
+from app.routes import polls
+from app.trending import TrendingCounter
+
+from .conftest import FakeCollection
+
+
+class _Tenant:
+    def __init__(self, poll_docs=(), matched=1):
+        self.polls = FakeCollection(poll_docs, matched=matched)
+        self.votes = FakeCollection()
+        self.lifecycle = PollLifecycle(self.polls)
+        self.trending = TrendingCounter(None, replica_id="test")
+        self.tokens = 1
+
+    def check_vote_quota(self):
+        if self.tokens < 1:
+            raise HTTPException(status_code=429, detail="Vote rate limit exceeded for tenant")
+        self.tokens -= 1
+
+    def refund_vote_quota(self):
+        self.tokens += 1
+
+    async def check_poll_quota(self):
+        pass
+
+
+POLL = {"id": "p", "active": True, "options": [{"id": "o", "votes": 0}]}
+REQUEST = SimpleNamespace(client=SimpleNamespace(host="203.0.113.9"))
+
+
+def test_vote_rolled_back_when_poll_closes_before_count():
+    # The poll is found active, then closes before the guarded $inc runs
+    tenant = _Tenant([POLL], matched=0)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(polls.cast_vote(VoteRequest(poll_id="p", option_id="o"), REQUEST, tenant))
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "Poll is closed"
+    assert tenant.votes.docs == []
+    assert tenant.trending._windows == {}
+
+
+def test_vote_counted_when_poll_still_open():
+    tenant = _Tenant([POLL])
+
+    response = asyncio.run(polls.cast_vote(VoteRequest(poll_id="p", option_id="o"), REQUEST, tenant))
+
+    assert response["message"] == "Vote cast successfully"
+    assert len(tenant.votes.docs) == 1
+    assert "p" in tenant.trending._windows
+
+
+def test_throttled_vote_does_not_read_database():
+    tenant = _Tenant([POLL])
+    tenant.tokens = 0
+
+    async def no_reads(*args, **kwargs):
+        raise AssertionError("database read before rate limit")
+
+    tenant.polls.find_one = no_reads
+    tenant.votes.find_one = no_reads
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(polls.cast_vote(VoteRequest(poll_id="p", option_id="o"), REQUEST, tenant))
+    assert error.value.status_code == 429
+
+
+def test_rejected_vote_refunds_rate_limit_token():
+    tenant = _Tenant([POLL])
+    tenant.votes.docs.append({"poll_id": "p", "voter_ip": REQUEST.client.host})
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(polls.cast_vote(VoteRequest(poll_id="p", option_id="o"), REQUEST, tenant))
+    assert error.value.status_code == 400
+    assert tenant.tokens == 1
+
+
+@pytest.mark.parametrize("opens_at, closes_at, detail", [
+    (None, datetime.utcnow() - timedelta(minutes=1), "closes_at must be in the future"),
+    (datetime.utcnow() + timedelta(hours=2), datetime.utcnow() + timedelta(hours=1),
+     "closes_at must be after opens_at"),
+])
+def test_create_poll_rejects_bad_schedule(opens_at, closes_at, detail):
+    poll_data = PollCreate(
+        title="t", description="d", options=[{"title": "a"}],
+        opens_at=opens_at, closes_at=closes_at
+    )
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(polls.create_poll(poll_data, _Tenant()))
+
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
@@ -0,0 +1,169 @@
+import asyncio
+import importlib.util
+
+import pytest
+from fastapi import HTTPException
+
+from app import tenants
+from app.tenants import Tenant, TenantRegistry, _RateLimiter, resolve_tenant_name
+
+from .conftest import FakeCollection
+
+
+def _upserted(fake):
+    return [query["name"] for query, _ in fake.updates]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fake = FakeCollection([{"name": "acme"}])
+    monkeypatch.setattr(tenants, "tenants_collection", fake)
+    monkeypatch.setattr(tenants, "TENANT_ALLOWLIST", {"listed"})
+
+    async def bootstrap(self):
+        if self.name == "broken":
+            raise RuntimeError("not authorized")
+
+    monkeypatch.setattr(Tenant, "bootstrap", bootstrap)
+    registry = TenantRegistry()
+    registry.fake = fake
+    return registry
+
+
+def test_header_used_without_host_routing(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_DOMAIN", "")
+    assert resolve_tenant_name("Acme", "acme.voting.example.com") == "acme"
+    assert resolve_tenant_name(None, "localhost:8001") == tenants.DEFAULT_TENANT
+
+
+def test_host_decides_with_host_routing(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_DOMAIN", "voting.example.com")
+    monkeypatch.setattr(tenants, "TENANT_TRUSTED_PROXIES", {"10.0.0.1"})
+
+    assert resolve_tenant_name("other", "acme.voting.example.com:443", "203.0.113.9") == "acme"
+    assert resolve_tenant_name(None, "voting.example.com") == tenants.DEFAULT_TENANT
+    assert resolve_tenant_name("other", "acme.voting.example.com", "10.0.0.1") == "other"
+
+
+def test_invalid_tenant_name_is_rejected(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_DOMAIN", "")
+    with pytest.raises(HTTPException) as error:
+        resolve_tenant_name("Bad_Name!", None)
+    assert error.value.status_code == 400
+
+
+def test_unknown_tenant_is_not_created(registry):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(registry.get("stranger"))
+    assert error.value.status_code == 404
+    assert _upserted(registry.fake) == []
+    assert "stranger" not in registry._locks
+
+
+def test_unknown_tenant_lookup_is_cached(registry, monkeypatch):
+    lookups = []
+    find_one = registry.fake.find_one
+
+    async def counting_find_one(query, projection=None):
+        lookups.append(query["name"])
+        return await find_one(query, projection)
+
+    monkeypatch.setattr(registry.fake, "find_one", counting_find_one)
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            asyncio.run(registry.get("stranger"))
+    assert lookups == ["stranger"]
+
+    # Entries expire, so a tenant registered later is picked up
+    registry._unknown["stranger"] = 0
+    registry.fake.docs.append({"name": "stranger"})
+    assert asyncio.run(registry.get("stranger")).name == "stranger"
+
+
+def test_unknown_tenant_cache_is_bounded(registry, monkeypatch):
+    monkeypatch.setattr(tenants, "_UNKNOWN_TENANT_CACHE_SIZE", 3)
+    for i in range(10):
+        with pytest.raises(HTTPException):
+            asyncio.run(registry.get(f"stranger-{i}"))
+    assert list(registry._unknown) == ["stranger-7", "stranger-8", "stranger-9"]
+
+
+def test_invalid_tenant_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("TENANT_MODE", "collections")
+    spec = importlib.util.spec_from_file_location("app._tenants_mode_check", tenants.__file__)
+    with pytest.raises(ValueError):
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+
+def test_registered_and_allowlisted_tenants_are_routed(registry):
+    assert asyncio.run(registry.get("acme")).name == "acme"
+    assert asyncio.run(registry.get("listed")).name == "listed"
+    assert _upserted(registry.fake) == ["acme", "listed"]
+
+
+def test_failed_bootstrap_is_not_recorded(registry, monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_ALLOWLIST", {"broken"})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(registry.get("broken"))
+    assert error.value.status_code == 503
+    assert _upserted(registry.fake) == []
+    assert "broken" not in registry._tenants
+
+
+def test_start_survives_failing_tenant(registry):
+    registry.fake.docs.append({"name": "broken"})
+    asyncio.run(registry.start())
+    assert set(registry._tenants) == {tenants.DEFAULT_TENANT, "acme"}
+
+
+def test_tenants_are_isolated(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_MODE", "database")
+    a, b, default = Tenant("a"), Tenant("b"), Tenant(tenants.DEFAULT_TENANT)
+    assert a.polls.database.name == f"{tenants.DATABASE_NAME}_a"
+    assert b.votes.database.name == f"{tenants.DATABASE_NAME}_b"
+    assert default.polls.full_name == f"{tenants.DATABASE_NAME}.polls"
+
+    monkeypatch.setattr(tenants, "TENANT_MODE", "collection")
+    assert Tenant("a").polls.full_name == f"{tenants.DATABASE_NAME}.a_polls"
+    assert Tenant("b").votes.full_name == f"{tenants.DATABASE_NAME}.b_votes"
+
+
+def test_vote_rate_limit():
+    tenant = Tenant("acme", votes_per_second=1)
+    tenant.check_vote_quota()
+    with pytest.raises(HTTPException) as error:
+        tenant.check_vote_quota()
+    assert error.value.status_code == 429
+
+    Tenant("acme").check_vote_quota()
+
+
+def test_vote_rate_limit_below_one_per_second(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(tenants.time, "monotonic", lambda: clock[0])
+    limiter = _RateLimiter(0.5)
+
+    assert limiter.allow()
+    assert not limiter.allow()
+    clock[0] += 1.0
+    assert not limiter.allow()
+    clock[0] += 1.0
+    assert limiter.allow()
+
+
+def test_refund_returns_token():
+    tenant = Tenant("acme", votes_per_second=1)
+    tenant.check_vote_quota()
+    tenant.refund_vote_quota()
+    tenant.check_vote_quota()
+
+
+def test_poll_quota_counts_active_polls():
+    tenant = Tenant("acme", max_polls=2)
+    tenant.polls = FakeCollection([{"active": True}, {"active": False}, {"active": False}])
+    asyncio.run(tenant.check_poll_quota())
+
+    tenant.polls.docs.append({"active": True})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(tenant.check_poll_quota())
+    assert error.value.status_code == 429
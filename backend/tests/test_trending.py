@@ -0,0 +1,93 @@
+import asyncio
+import random
+
+from app import trending
+from app.trending import TrendingCounter, _PollWindow, _WINDOW_SIZES
+
+from .conftest import FakeCollection
+
+
+def test_poll_window_matches_brute_force_count():
+    rng = random.Random(0)
+    for _ in range(200):
+        window = _PollWindow(1000)
+        events = []
+        now = 1000
+        for _ in range(300):
+            now += rng.choice([0, 0, 1, 2, 5, 30, 200])
+            window.record(now)
+            events.append(now)
+            if rng.random() < 0.05:
+                now += rng.randint(0, 1200)
+                window.advance(now)
+            for i, size in enumerate(_WINDOW_SIZES):
+                assert window.totals[i] == sum(1 for event in events if event > now - size)
+
+
+def test_poll_window_expires_after_largest_window():
+    window = _PollWindow(0)
+    window.record(0)
+    window.record(0)
+    window.advance(59)
+    assert window.totals == [2, 2, 2]
+    window.advance(60)
+    assert window.totals == [0, 2, 2]
+    window.advance(900)
+    assert window.totals == [0, 0, 0]
+    assert all(not buckets for buckets in window.buckets)
+
+
+def test_poll_window_clamps_clock_going_backwards():
+    window = _PollWindow(0)
+    window.record(100)
+    window.record(30)
+    assert window.totals == [2, 2, 2]
+    window.advance(160)
+    assert window.totals == [0, 2, 2]
+
+
+def test_top_orders_by_window_votes(monkeypatch):
+    monkeypatch.setattr(trending.time, "time", lambda: 1000.0)
+    counter = TrendingCounter(None, replica_id="a")
+    for poll_id, votes in [("low", 1), ("high", 3), ("mid", 2)]:
+        for _ in range(votes):
+            counter.record(poll_id)
+    counter._remote = {"low": [5, 5, 5]}
+
+    assert counter.top("5m", 2) == [("low", 6), ("high", 3)]
+
+
+def test_record_evicts_coldest_polls_when_full(monkeypatch):
+    monkeypatch.setattr(trending, "MAX_TRACKED_POLLS", 10)
+    monkeypatch.setattr(trending.time, "time", lambda: 1000.0)
+    counter = TrendingCounter(None, replica_id="a")
+    counter.record("hot")
+    counter.record("hot")
+    for i in range(20):
+        counter.record(f"cold-{i}")
+
+    assert len(counter._windows) <= 10
+    assert "hot" in counter._windows
+
+
+def test_idle_counter_skips_most_syncs(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(trending.time, "time", lambda: clock[0])
+    collection = FakeCollection()
+    finds = []
+    find = collection.find
+    collection.find = lambda *args, **kwargs: finds.append(args) or find(*args, **kwargs)
+    counter = TrendingCounter(collection, replica_id="a")
+
+    for _ in range(trending.IDLE_SYNC_EVERY):
+        asyncio.run(counter.sync())
+    assert collection.updates == []
+    assert len(finds) == 1
+
+    # A vote is published, and so is the empty report once it expires
+    counter.record("p")
+    asyncio.run(counter.sync())
+    clock[0] += 900
+    asyncio.run(counter.sync())
+    asyncio.run(counter.sync())
+    assert [update["$set"]["totals"] for _, update in collection.updates] == [{"p": [1, 1, 1]}, {}]
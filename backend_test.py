@@ -8,7 +8,7 @@ import requests
 import json
 import time
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
@@ -321,6 +321,167 @@ class VotingAppTester:
             self.log_test("Poll Deactivation", False, "Connection failed", str(e))
             return False
 
+    def create_scheduled_poll(self, opens_at=None, closes_at=None):
+        """Create a two-option poll with an optional schedule, returning the raw response"""
+        poll_data = {
+            "title": "Scheduled Poll",
+            "description": "Poll with an opening and closing time",
+            "options": [
+                {"title": "Yes", "description": "In favour"},
+                {"title": "No", "description": "Against"}
+            ]
+        }
+        if opens_at:
+            poll_data["opens_at"] = opens_at.isoformat() + "Z"
+        if closes_at:
+            poll_data["closes_at"] = closes_at.isoformat() + "Z"
+        
+        response = requests.post(f"{self.base_url}/polls", json=poll_data, timeout=10)
+        if response.status_code == 200:
+            self.created_polls.append(response.json()["id"])
+        return response
+
+    def test_schedule_validation(self):
+        """Test POST /api/polls rejects closes_at before opens_at"""
+        try:
+            now = datetime.utcnow()
+            response = self.create_scheduled_poll(opens_at=now + timedelta(hours=1), closes_at=now)
+            
+            if response.status_code == 400:
+                self.log_test("Schedule Validation", True, "Rejected closes_at before opens_at")
+                return True
+            else:
+                self.log_test("Schedule Validation", False, f"Expected 400, got {response.status_code}", response.text)
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Schedule Validation", False, "Connection failed", str(e))
+            return False
+
+    def test_vote_before_open(self):
+        """Test votes are rejected for polls that have not opened yet"""
+        try:
+            response = self.create_scheduled_poll(opens_at=datetime.utcnow() + timedelta(hours=1))
+            if response.status_code != 200:
+                self.log_test("Vote Before Open", False, f"Poll creation failed: HTTP {response.status_code}", response.text)
+                return False
+            poll = response.json()
+            
+            vote_data = {"poll_id": poll["id"], "option_id": poll["options"][0]["id"]}
+            response = requests.post(f"{self.base_url}/votes", json=vote_data, timeout=10)
+            
+            if response.status_code == 400 and "not open" in response.json().get("detail", "").lower():
+                self.log_test("Vote Before Open", True, "Correctly rejected vote before opens_at")
+                return True
+            else:
+                self.log_test("Vote Before Open", False, f"Expected 400, got {response.status_code}", response.text)
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Vote Before Open", False, "Connection failed", str(e))
+            return False
+
+    def test_vote_after_close(self):
+        """Test polls close on schedule and reject further votes"""
+        try:
+            response = self.create_scheduled_poll(closes_at=datetime.utcnow() + timedelta(seconds=2))
+            if response.status_code != 200:
+                self.log_test("Vote After Close", False, f"Poll creation failed: HTTP {response.status_code}", response.text)
+                return False
+            poll = response.json()
+            
+            time.sleep(3)
+            vote_data = {"poll_id": poll["id"], "option_id": poll["options"][0]["id"]}
+            response = requests.post(f"{self.base_url}/votes", json=vote_data, timeout=10)
+            
+            if response.status_code in [400, 404]:
+                self.log_test("Vote After Close", True, "Correctly rejected vote after closes_at")
+                return True
+            else:
+                self.log_test("Vote After Close", False, f"Expected 400/404, got {response.status_code}", response.text)
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Vote After Close", False, "Connection failed", str(e))
+            return False
+
+    def test_frozen_results(self, poll_id, results_before):
+        """Test results of a deactivated poll are frozen"""
+        try:
+            response = requests.get(f"{self.base_url}/polls/{poll_id}/results", timeout=10)
+            if response.status_code != 200:
+                self.log_test("Frozen Results", False, f"HTTP {response.status_code}", response.text)
+                return False
+            frozen = response.json()
+            
+            vote_data = {"poll_id": poll_id, "option_id": frozen["options"][-1]["id"]}
+            requests.post(f"{self.base_url}/votes", json=vote_data, timeout=10)
+            response = requests.get(f"{self.base_url}/polls/{poll_id}/results", timeout=10)
+            
+            if frozen["total_votes"] == results_before["total_votes"] and response.json() == frozen:
+                self.log_test("Frozen Results", True, "Results unchanged after deactivation")
+                return True
+            else:
+                self.log_test("Frozen Results", False, "Results changed after deactivation", response.text)
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Frozen Results", False, "Connection failed", str(e))
+            return False
+
+    def test_trending_polls(self, poll_id):
+        """Test GET /api/polls/trending - Busiest polls in a recent window"""
+        try:
+            response = requests.get(f"{self.base_url}/polls/trending", params={"window": "5m", "limit": 20}, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                votes = [poll["votes"] for poll in data.get("polls", [])]
+                poll_ids = [poll["poll_id"] for poll in data.get("polls", [])]
+                if votes != sorted(votes, reverse=True):
+                    self.log_test("Trending Polls", False, "Trending polls not ordered by votes", data)
+                    return False
+                elif poll_id not in poll_ids:
+                    self.log_test("Trending Polls", False, "Recently voted poll missing from trending", data)
+                    return False
+                else:
+                    self.log_test("Trending Polls", True, f"Retrieved {len(votes)} trending polls in vote order")
+                    return True
+            else:
+                self.log_test("Trending Polls", False, f"HTTP {response.status_code}", response.text)
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            self.log_test("Trending Polls", False, "Connection failed", str(e))
+            return False
+
+    def test_trending_validation(self):
+        """Test GET /api/polls/trending rejects bad window and limit values"""
+        cases = [
+            ({"window": "2h"}, 400),
+            ({"limit": 0}, 422),
+            ({"limit": 101}, 422),
+        ]
+        for params, expected in cases:
+            response = requests.get(f"{self.base_url}/polls/trending", params=params, timeout=10)
+            if response.status_code == expected:
+                self.log_test("Trending Validation", True, f"Correctly returned {expected} for {params}")
+            else:
+                self.log_test("Trending Validation", False, f"Expected {expected} for {params}, got {response.status_code}")
+
+    def test_tenant_routing(self):
+        """Test tenant header handling for invalid and unregistered tenants"""
+        cases = [
+            ("Not A Tenant!", 400),
+            (f"unregistered-{int(time.time())}", 404),
+        ]
+        for tenant, expected in cases:
+            response = requests.get(f"{self.base_url}/polls", headers={"X-Tenant-ID": tenant}, timeout=10)
+            if response.status_code == expected:
+                self.log_test("Tenant Routing", True, f"Correctly returned {expected} for tenant '{tenant}'")
+            else:
+                self.log_test("Tenant Routing", False, f"Expected {expected} for tenant '{tenant}', got {response.status_code}")
+
     def run_comprehensive_tests(self):
         """Run all backend tests in sequence"""
         print("=" * 60)
@@ -365,14 +526,25 @@ class VotingAppTester:
         # 4. Results system tests
         print("📈 TESTING RESULTS SYSTEM...")
         results = self.test_get_poll_results(poll_id)
+        self.test_trending_polls(poll_id)
+        self.test_trending_validation()
 
         # 5. Error handling tests
         print("⚠️  TESTING ERROR HANDLING...")
         self.test_invalid_poll_operations()
+        self.test_tenant_routing()
 
         # 6. Poll lifecycle tests
         print("🔄 TESTING POLL LIFECYCLE...")
         self.test_poll_deactivation(poll_id)
+        if results:
+            self.test_frozen_results(poll_id, results)
+        
+        # 7. Scheduled poll tests
+        print("⏰ TESTING POLL SCHEDULING...")
+        self.test_schedule_validation()
+        self.test_vote_before_open()
+        self.test_vote_after_close()
 
         # Summary
         print("=" * 60)
@@ -9,16 +9,24 @@ db = db.getSiblingDB('voting_app');
 // Create collections
 db.createCollection('polls');
 db.createCollection('votes');
+db.createCollection('trending');
+db.createCollection('tenants');
 
 // Create indexes for better performance
 db.polls.createIndex({ "id": 1 }, { unique: true });
 db.polls.createIndex({ "active": 1 });
 db.polls.createIndex({ "created_at": 1 });
+db.polls.createIndex({ "active": 1, "closes_at": 1 });
 
 db.votes.createIndex({ "poll_id": 1, "voter_ip": 1 }, { unique: true });
 db.votes.createIndex({ "poll_id": 1 });
 db.votes.createIndex({ "timestamp": 1 });
 
+db.trending.createIndex({ "replica_id": 1 }, { unique: true });
+db.trending.createIndex({ "updated_at": 1 }, { expireAfterSeconds: 300 });
+
+db.tenants.createIndex({ "name": 1 }, { unique: true });
+
 // Insert sample poll for testing
 const samplePoll = {
   id: "sample-poll-001",
@@ -71,6 +79,6 @@ db.createUser({
 });
 
 print("Database initialization completed successfully!");
-print("Collections created: polls, votes");
+print("Collections created: polls, votes, trending, tenants");
 print("Indexes created for performance optimization");
 print("Sample poll inserted for testing");
\ No newline at end of file